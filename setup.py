@@ -25,6 +25,7 @@ setup(
     entry_points={
         'console_scripts': [
             'ndf_x_ray=x_ray.x_ray:main',
+            'ndf_x_ray_recolorize=x_ray.recolorize:main',
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,45 @@
+import pytest
+from ufoLib2.objects.component import Component
+from ufoLib2.objects.font import Font
+
+STATIC_LOCATION = dict(outline_width=5, line_width=5, point_size=20, handle_size=20)
+
+
+def build_font(composites=True):
+	font = Font()
+	font.info.unitsPerEm = 1000
+	font.info.ascender = 800
+	font.info.descender = -200
+	font.info.xHeight = 500
+	base = font.newGlyph("A")
+	base.width = 600
+	pen = base.getPen()
+	pen.moveTo((0, 0))
+	pen.curveTo((100, 700), (500, 700), (600, 0))
+	pen.closePath()
+	accent = font.newGlyph("acute")
+	pen = accent.getPen()
+	pen.moveTo((250, 750))
+	pen.lineTo((350, 750))
+	pen.lineTo((300, 850))
+	pen.closePath()
+	if composites:
+		composite = font.newGlyph("Aacute")
+		composite.width = 600
+		composite.components = [Component("A"), Component("acute", (1, 0, 0, 1, 20, 0))]
+		nested = font.newGlyph("Aacute.alt")
+		nested.width = 600
+		nested.components = [Component("Aacute", (1, 0, 0, 1, 0, 10))]
+	return font
+
+
+
+@pytest.fixture
+def make_font():
+	"""Factory for a small font with a base glyph, an accent and two levels of composites."""
+	return build_font
+
+
+@pytest.fixture
+def static_location():
+	return dict(STATIC_LOCATION)
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from ufoLib2.objects.component import Component
+
+import x_ray.x_ray as x_ray_module
+from x_ray.contour_cache import ContourCache
+from x_ray.x_ray import glyph_processing_order, is_composite, x_ray
+
+def test_bases_come_before_composites(make_font):
+	order = glyph_processing_order(make_font())
+	assert order.index("A") < order.index("Aacute") < order.index("Aacute.alt")
+	assert order.index("acute") < order.index("Aacute")
+
+
+def test_missing_component_is_skipped(caplog, make_font):
+	font = make_font()
+	font["Aacute"].components.append(Component("missing"))
+	with caplog.at_level(logging.WARNING):
+		order = glyph_processing_order(font)
+	assert sorted(order) == sorted(font.keys())
+	assert "missing" in caplog.text
+
+
+def test_component_cycle_is_skipped(caplog, make_font):
+	font = make_font()
+	font["Aacute"].components.append(Component("Aacute.alt"))
+	with caplog.at_level(logging.WARNING):
+		order = glyph_processing_order(font)
+	assert sorted(order) == sorted(font.keys())
+	assert "cycle" in caplog.text
+
+
+def test_composites_never_recompute_geometry(monkeypatch, make_font, static_location):
+	normalized = []
+	normalize_glyph = x_ray_module.normalize_glyph
+
+	def recording_normalize_glyph(glyph, *args, **kwargs):
+		normalized.append(glyph.name)
+		return normalize_glyph(glyph, *args, **kwargs)
+
+	monkeypatch.setattr(x_ray_module, "normalize_glyph", recording_normalize_glyph)
+	font = make_font()
+	cache = ContourCache()
+	x_ray(font, static_location=static_location, contour_cache=cache)
+	base_cache = ContourCache()
+	x_ray(make_font(composites=False), static_location=static_location, contour_cache=base_cache)
+
+	assert not any(is_composite(font[name]) for name in normalized)
+	# composites add no contour lookups on top of their bases
+	assert cache.stats() == base_cache.stats()
+
+
+def test_font_with_missing_component_builds(make_font, static_location):
+	font = make_font()
+	font["Aacute"].components.append(Component("missing"))
+	compiled = x_ray(font, static_location=static_location)
+	assert "Aacute" in compiled.getGlyphOrder()
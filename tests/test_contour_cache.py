@@ -0,0 +1,33 @@
+from ufoLib2.objects.glyph import Glyph
+
+from x_ray.contour_cache import ContourCache
+from x_ray.x_ray import normalize_glyph, process_outline
+
+
+def make_glyph(offset):
+	glyph = Glyph()
+	for index in range(20):
+		pen = glyph.getPen()
+		pen.moveTo((offset, 0))
+		pen.curveTo((offset + 10, 40 + index), (offset + 50, 40 + index), (offset + 60, 0))
+		pen.closePath()
+	return glyph
+
+
+def contour_points(glyph):
+	return [[(point.x, point.y, point.type) for point in contour] for contour in glyph.contours]
+
+
+def test_bounded_cache_matches_unbounded():
+	small_cache = ContourCache(memory_limit=4096)
+	large_cache = ContourCache()
+	for offset in (0, 100, 200):
+		glyph = make_glyph(offset)
+		small = process_outline(normalize_glyph(glyph, 10, small_cache), 8, small_cache)
+		large = process_outline(normalize_glyph(glyph, 10, large_cache), 8, large_cache)
+		assert contour_points(small) == contour_points(large)
+	stats = small_cache.stats()
+	assert stats["evictions"] > 0
+	assert 0 < stats["memory"] <= 4096
+	assert large_cache.stats()["evictions"] == 0
+	assert large_cache.stats()["size"] > stats["size"]
@@ -0,0 +1,99 @@
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+from ufoLib2.objects.glyph import Glyph
+
+from x_ray.glyph_store import GlyphStore, object_size
+from x_ray.x_ray import XRayCancelled, x_ray
+
+
+def make_glyph():
+	glyph = Glyph()
+	pen = glyph.getPen()
+	pen.moveTo((0, 0))
+	for x in range(1, 100):
+		pen.lineTo((x, x * 2))
+	pen.closePath()
+	return glyph
+
+
+def test_object_size_is_not_pickled_size():
+	glyph = make_glyph()
+	assert object_size(glyph) > len(pickle.dumps(glyph, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_glyph_store_respects_memory_limit(tmp_path):
+	size = object_size(make_glyph())
+	store = GlyphStore(tmp_path / "store", memory_limit=size * 3)
+	for index in range(30):
+		store[index] = make_glyph()
+	assert len(store.cache) == 3
+	assert store.cache_size <= store.memory_limit
+	assert [point.y for point in store[0].contours[0]] == [point.y for point in make_glyph().contours[0]]
+	store.close()
+
+
+@pytest.mark.parametrize("static", [True, False])
+def test_low_memory_matches_default(static, make_font, static_location):
+	location = static_location if static else None
+	default = x_ray(make_font(), static_location=location)
+	low_memory = x_ray(make_font(), static_location=location, low_memory=True, memory_limit=1)
+	for tag in ["glyf", "COLR", "CPAL"] + ([] if static else ["gvar"]):
+		assert default[tag].compile(default) == low_memory[tag].compile(low_memory)
+
+
+@pytest.mark.parametrize("stage", ["normalize", "process", "compile"])
+def test_cancelled_low_memory_build_cleans_up(stage, tmp_path, monkeypatch, make_font):
+	monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+	cancel_event = threading.Event()
+
+	def progress_callback(current_stage, done, total):
+		if current_stage == stage:
+			cancel_event.set()
+
+	with pytest.raises(XRayCancelled):
+		x_ray(make_font(), low_memory=True, progress_callback=progress_callback, cancel_event=cancel_event)
+	assert list(tmp_path.iterdir()) == []
+
+
+PEAK_MEMORY_SCRIPT = """
+import resource, sys
+from ufoLib2 import Font
+from x_ray.x_ray import x_ray
+x_ray(Font.open(sys.argv[1]), low_memory=sys.argv[2] == "1", memory_limit=1024 * 1024)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# kilobytes, except on macOS
+print(peak // 1024 if sys.platform == "darwin" else peak)
+"""
+
+
+def peak_memory(font_path, low_memory):
+	output = subprocess.run(
+		[sys.executable, "-c", PEAK_MEMORY_SCRIPT, str(font_path), "1" if low_memory else "0"],
+		cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True,
+	).stdout
+	return int(output.split()[-1])
+
+
+def test_low_memory_lowers_peak_memory(tmp_path, make_font):
+	pytest.importorskip("resource")
+	font = make_font()
+	for index in range(30):
+		glyph = font.newGlyph(f"glyph{index}")
+		glyph.width = 600
+		pen = glyph.getPen()
+		for contour in range(4):
+			x, y = index % 7 * 20 + contour * 110, index % 5 * 30
+			pen.moveTo((x, y))
+			pen.curveTo((x + 20, y + 300), (x + 80, y + 300), (x + 100, y))
+			pen.curveTo((x + 80, y - 200), (x + 20, y - 200), (x + 5, y + 10))
+			pen.closePath()
+	font_path = tmp_path / "generated.ufo"
+	font.save(font_path)
+	# in kilobytes, most of the peak of both builds is the interpreter and imports
+	assert peak_memory(font_path, low_memory=False) - peak_memory(font_path, low_memory=True) > 10 * 1024
@@ -0,0 +1,180 @@
+"""Golden-output corpus for the offsetting and stroking engines.
+
+Every case is compared against tests/data/offsets_golden.json; run with
+X_RAY_REGENERATE_GOLDEN=1 to rewrite the fixture after an intended change.
+"""
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import pytest
+from ufoLib2.objects.glyph import Glyph
+from ufoLib2.objects.point import Point
+
+from x_ray.outline_glyph import calculate_offset_vector, get_simple_offsets
+from x_ray.x_ray import process_line, process_outline
+
+GOLDEN_PATH = Path(__file__).parent / "data" / "offsets_golden.json"
+REGENERATE = os.environ.get("X_RAY_REGENERATE_GOLDEN") == "1"
+TOLERANCE = 1e-6
+
+# polylines fed directly to get_simple_offsets
+POLYGONS = {
+	"square": [(0, 0), (100, 0), (100, 100), (0, 100)],
+	"zero_length": [(0, 0), (0, 0), (100, 0), (100, 0), (100, 100)],
+	"zero_length_run": [(0, 0), (0, 0), (0, 0), (100, 0), (50, 100)],
+	"collinear_run": [(0, 0), (50, 0), (100, 0), (50, 100)],
+	"collinear_vertical": [(0, 0), (100, 0), (100, 50), (100, 100), (0, 100)],
+	"cusp": [(0, 0), (100, 0), (50, 0), (50, 100)],
+	"degenerate": [(5, 5), (5, 5), (5, 5)],
+}
+
+# segments drawn with a segment pen into a glyph
+GLYPHS = {
+	"overlapping_handles": [
+		("moveTo", [(0, 0)]),
+		("curveTo", [(300, 200), (-100, 200), (200, 0)]),
+		("closePath", []),
+	],
+	"cusp_curve": [
+		("moveTo", [(0, 0)]),
+		("curveTo", [(100, 100), (0, 100), (100, 0)]),
+		("lineTo", [(50, -50)]),
+		("closePath", []),
+	],
+	"zero_handles": [
+		("moveTo", [(0, 0)]),
+		("curveTo", [(0, 0), (100, 100), (100, 100)]),
+		("lineTo", [(100, 0)]),
+		("closePath", []),
+	],
+	"collinear_curve": [
+		("moveTo", [(0, 0)]),
+		("curveTo", [(30, 0), (70, 0), (100, 0)]),
+		("lineTo", [(50, 80)]),
+		("closePath", []),
+	],
+	"quadratic_zero_length": [
+		("moveTo", [(0, 0)]),
+		("qCurveTo", [(0, 0), (50, 50), (50, 50), (100, 0)]),
+		("closePath", []),
+	],
+	"quadratic_all_coincident": [
+		("moveTo", [(0, 0)]),
+		("qCurveTo", [(0, 0), (0, 0)]),
+		("lineTo", [(100, 0)]),
+		("closePath", []),
+	],
+	"quadratic": [
+		("moveTo", [(0, 0)]),
+		("qCurveTo", [(0, 100), (100, 100), (100, 0)]),
+		("closePath", []),
+	],
+}
+
+
+def make_points(coordinates):
+	return [Point(x, y) for x, y in coordinates]
+
+
+def make_glyph(segments):
+	glyph = Glyph()
+	pen = glyph.getPen()
+	for method, points in segments:
+		getattr(pen, method)(*points)
+	return glyph
+
+
+def glyph_contours(glyph):
+	return [[[point.x, point.y] for point in contour] for contour in glyph.contours]
+
+
+def compute_results():
+	results = {}
+	for name, coordinates in POLYGONS.items():
+		for offset in (-5, 5):
+			offsets = get_simple_offsets(make_points(coordinates), offset)
+			results[f"offsets/{name}/{offset}"] = [list(point) for point in offsets]
+	for name, segments in GLYPHS.items():
+		results[f"outline/{name}"] = glyph_contours(process_outline(make_glyph(segments), 10))
+		results[f"line/{name}"] = glyph_contours(process_line(make_glyph(segments), 10))
+	return results
+
+
+def assert_close(actual, expected, path=""):
+	if isinstance(expected, list):
+		assert isinstance(actual, list) and len(actual) == len(expected), path
+		for index, (actual_item, expected_item) in enumerate(zip(actual, expected)):
+			assert_close(actual_item, expected_item, f"{path}[{index}]")
+	else:
+		assert math.isclose(actual, expected, abs_tol=TOLERANCE), f"{path}: {actual} != {expected}"
+
+
+@pytest.fixture(scope="module")
+def golden():
+	if REGENERATE:
+		GOLDEN_PATH.write_text(json.dumps(compute_results(), indent=1) + "\n")
+	return json.loads(GOLDEN_PATH.read_text())
+
+
+@pytest.fixture(scope="module")
+def results():
+	return compute_results()
+
+
+def test_golden_covers_corpus(golden, results):
+	assert sorted(golden) == sorted(results)
+
+
+@pytest.mark.parametrize("key", sorted(compute_results()))
+def test_matches_golden(key, golden, results):
+	assert_close(results[key], golden[key], key)
+
+
+@pytest.mark.parametrize("p0, p1, p2", [
+	((-10, 0), (0, 0), (10, 0)),
+	((0, -10), (0, 0), (0, 10)),
+	((10, 0), (0, 0), (-10, 0)),
+	((-7, -7), (0, 0), (7, 7)),
+])
+def test_collinear_offset_is_perpendicular(p0, p1, p2):
+	offset_x, offset_y = calculate_offset_vector(p0, p1, p2, 5)
+	direction = (p1[0] - p0[0], p1[1] - p0[1])
+	assert math.isclose(math.hypot(offset_x, offset_y), 5)
+	assert math.isclose(offset_x * direction[0] + offset_y * direction[1], 0, abs_tol=TOLERANCE)
+
+
+def test_collinear_offset_continues_bisector_side():
+	# a nearly straight corner and a straight one must offset to the same side
+	straight = calculate_offset_vector((0, -10), (0, 0), (0, 10), 5)
+	nearly_straight = calculate_offset_vector((0, -10), (0, 0), (-0.001, 10), 5)
+	assert straight[0] * nearly_straight[0] > 0
+
+
+def test_zero_length_segment_uses_distinct_neighbours():
+	offsets = get_simple_offsets(make_points(POLYGONS["zero_length"]), 5)
+	assert offsets[0] == offsets[1]
+	assert offsets[2] == offsets[3]
+	assert all(offset != (0, 0) for offset in offsets)
+
+
+def test_degenerate_contour_stays_in_place():
+	offsets = get_simple_offsets(make_points(POLYGONS["degenerate"]), 5)
+	assert offsets == [(5, 5)] * 3
+
+
+def test_quadratic_zero_length_handle_lines_are_drawn():
+	glyph = process_line(make_glyph(GLYPHS["quadratic_all_coincident"]), 10)
+	assert glyph.contours == []
+	glyph = process_line(make_glyph(GLYPHS["quadratic_zero_length"]), 10)
+	assert len(glyph.contours) == 1 and len(glyph.contours[0]) > 0
+
+
+def test_offsets_timing():
+	# a generous budget; vectorized or parallel rewrites must stay well below it
+	start = time.perf_counter()
+	for _ in range(50):
+		compute_results()
+	assert time.perf_counter() - start < 5
@@ -0,0 +1,71 @@
+import pytest
+from fontTools.ttLib import TTFont
+
+from x_ray.colorize import build_cpal
+from x_ray.recolorize import get_table_offset, load_font_data, read_cpal_table, set_palettes
+from x_ray.x_ray import x_ray
+
+RED_PALETTE = ("#FF0000", "#FF0000", "#FF0000", "#FF000010")
+GREEN_PALETTE = ("#00FF00", "#00FF00", "#00FF00")
+BLUE_PALETTE = ("#0000FF", "#0000FF", "#0000FF", "#0000FF10")
+
+
+def palette_colors(palette):
+	return [(color.red, color.green, color.blue, color.alpha) for color in palette]
+
+
+def expected_colors(*palettes):
+	return [palette_colors(palette) for palette in build_cpal(palettes).palettes]
+
+
+@pytest.fixture
+def font_path(tmp_path, make_font, static_location):
+	path = tmp_path / "x_rayed.ttf"
+	x_ray(make_font(), static_location=static_location, palettes=[RED_PALETTE, GREEN_PALETTE]).save(path)
+	return path
+
+
+def read_palettes(path):
+	with TTFont(path) as font:
+		return [palette_colors(palette) for palette in font["CPAL"].palettes]
+
+
+def test_colorize_writes_every_palette(font_path):
+	assert read_palettes(font_path) == expected_colors(RED_PALETTE, GREEN_PALETTE)
+
+
+def test_replace_palettes(font_path, tmp_path):
+	output_path = tmp_path / "replaced.ttf"
+	set_palettes(font_path, [BLUE_PALETTE], output_path)
+	assert read_palettes(output_path) == expected_colors(BLUE_PALETTE)
+	assert read_palettes(font_path) == expected_colors(RED_PALETTE, GREEN_PALETTE)
+
+
+def test_append_palettes(font_path, tmp_path):
+	output_path = tmp_path / "appended.ttf"
+	set_palettes(font_path, [BLUE_PALETTE], output_path, append=True)
+	assert read_palettes(output_path) == expected_colors(RED_PALETTE, GREEN_PALETTE, BLUE_PALETTE)
+
+
+def test_set_palettes_in_place(font_path):
+	set_palettes(font_path, [BLUE_PALETTE], font_path)
+	assert read_palettes(font_path) == expected_colors(BLUE_PALETTE)
+	with TTFont(font_path) as font:
+		assert "COLR" in font and "glyf" in font
+	assert [path.name for path in font_path.parent.iterdir()] == [font_path.name]
+
+
+def test_empty_palettes_are_rejected(font_path):
+	with pytest.raises(ValueError):
+		build_cpal([])
+	with pytest.raises(ValueError):
+		set_palettes(font_path, [], font_path)
+	assert read_palettes(font_path) == expected_colors(RED_PALETTE, GREEN_PALETTE)
+
+
+def test_struct_helpers_read_cpal(font_path):
+	font_data = load_font_data(font_path)
+	palettes, version, num_palette_entries = read_cpal_table(font_data, get_table_offset(font_data, "CPAL"))
+	assert (version, num_palette_entries, len(palettes)) == (0, 4, 2)
+	red = palettes[0][0]
+	assert (red["r"], red["g"], red["b"]) == (255, 0, 0)
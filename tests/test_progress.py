@@ -0,0 +1,27 @@
+import io
+
+from x_ray.x_ray import PROGRESS_BATCH, ProgressPrinter, x_ray
+
+
+def test_progress_printer_throttles_redraws():
+	stream = io.StringIO()
+	printer = ProgressPrinter(stream, interval=60)
+	for done in range(1, 200_001):
+		printer("prepare", done, 200_000)
+	printer("compile", 1, 2)
+	printer("compile", 2, 2)
+	printer.finish()
+	lines = stream.getvalue().split("\n")
+	assert lines[0].count("\r") == 2
+	assert "200000/200000" in lines[0]
+	assert lines[1].count("\r") == 2
+	assert len(stream.getvalue()) < 1000
+
+
+def test_compile_progress_is_reported_in_batches(make_font):
+	reports = []
+	x_ray(make_font(), progress_callback=lambda stage, done, total: reports.append((stage, done, total)))
+	prepare = [report for report in reports if report[0] == "prepare"]
+	total = prepare[0][2]
+	assert len(prepare) <= total // PROGRESS_BATCH + 1
+	assert prepare[-1][1] == total
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from x_ray.x_ray import x_ray
+from x_ray.x_ray_async import x_ray_async
+
+
+@pytest.mark.parametrize("static_location", [
+	{"outline": 5},
+	{"outline_width": 0},
+	{"point_size": 41},
+])
+def test_invalid_static_location_is_rejected(static_location, make_font):
+	font = make_font()
+	with pytest.raises(ValueError):
+		x_ray(font, static_location=static_location)
+	# rejected before the font is scaled
+	assert font.info.unitsPerEm == 1000
+	with pytest.raises(ValueError):
+		asyncio.run(x_ray_async(font, static_location=static_location))
+
+
+def test_partial_static_location_uses_defaults(make_font):
+	compiled = x_ray(make_font(), static_location={"outline_width": 20})
+	assert "fvar" not in compiled
@@ -0,0 +1,86 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import x_ray.x_ray_async as x_ray_async_module
+from x_ray.x_ray_async import shutdown_executor, x_ray_async
+
+
+@pytest.fixture(autouse=True)
+def executor():
+	yield
+	shutdown_executor()
+	assert x_ray_async_module._jobs == {}
+
+
+async def started_job(waiters=1):
+	while not x_ray_async_module._jobs or next(iter(x_ray_async_module._jobs.values())).waiters < waiters:
+		await asyncio.sleep(0.001)
+	job, = x_ray_async_module._jobs.values()
+	return job
+
+
+def test_concurrent_identical_calls_share_one_job(make_font, static_location, monkeypatch):
+	jobs = []
+
+	class RecordingJob(x_ray_async_module.Job):
+		def __init__(self, *args):
+			super().__init__(*args)
+			jobs.append(self)
+
+	monkeypatch.setattr(x_ray_async_module, "Job", RecordingJob)
+
+	async def main():
+		font = make_font()
+		return await asyncio.gather(
+			x_ray_async(font, static_location=static_location),
+			x_ray_async(font, static_location=static_location),
+		)
+
+	first, second = asyncio.run(main())
+	assert len(jobs) == 1
+	assert first.getGlyphOrder() == second.getGlyphOrder()
+
+
+def test_cancelling_last_waiter_cancels_job(make_font):
+	async def main():
+		font = make_font()
+		first = asyncio.ensure_future(x_ray_async(font))
+		second = asyncio.ensure_future(x_ray_async(font))
+		job = await started_job(waiters=2)
+		first.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await first
+		# the other caller still waits for the build
+		assert not job.cancel_event.is_set()
+		assert list(x_ray_async_module._jobs.values()) == [job]
+		second.cancel()
+		with pytest.raises(asyncio.CancelledError):
+			await second
+		assert job.cancel_event.is_set()
+		assert x_ray_async_module._jobs == {}
+
+	asyncio.run(main())
+
+
+def test_broken_pool_is_replaced(make_font, static_location):
+	async def main():
+		font = make_font()
+		task = asyncio.ensure_future(x_ray_async(font))
+		job = await started_job()
+		for process in list(job.executor._processes.values()):
+			process.kill()
+		with pytest.raises(BrokenProcessPool):
+			await task
+		compiled = await x_ray_async(font, static_location=static_location)
+		assert x_ray_async_module._executor is not job.executor
+		return compiled
+
+	assert "glyf" in asyncio.run(main())
+
+
+@pytest.mark.parametrize("argument", ["progress_callback", "cancel_event", "contour_cache"])
+def test_unsupported_arguments_are_rejected(argument, make_font):
+	with pytest.raises(TypeError):
+		asyncio.run(x_ray_async(make_font(), **{argument: None}))
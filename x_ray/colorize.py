@@ -1,5 +1,5 @@
 from fontTools.ttLib import TTFont, newTable
-from fontTools.ttLib.tables.C_O_L_R_ import LayerRecord
+from fontTools.ttLib.tables import otTables as ot
 from fontTools.ttLib.tables.C_P_A_L_ import Color
 from fontTools.colorLib import builder
 
@@ -9,39 +9,104 @@ def hex_to_Color(value):
     r, g, b, *a = tuple(int(value[i:i + 2], 16) for i in range(0, len(value), 2))
     return Color(red=r, green=g, blue=b, alpha=a[0] if a else 255)
 
+suffixes = [("_outlined", 1), ("_lines", 2), ("_handles", 3), ("_points", 3)]
+filled_suffixes = [("_filled", 1), ("_lines", 2), ("_handles", 3), ("_points", 3)]
+bounds_suffixes = [("_bounds", 0)] + suffixes
+bounds_filled_suffixes = [("_bounds", 0)] + filled_suffixes
+
 # 0000000F
-def colorize(tt_font, glyph_order, outline_color, line_color, point_color, background_color="#00000010"):
+def build_palette(outline_color, line_color, point_color, background_color="#00000010"):
+    return [
+        hex_to_Color(background_color),
+        hex_to_Color(outline_color),
+        hex_to_Color(line_color),
+        hex_to_Color(point_color),
+    ]
+
+def build_cpal(palettes):
+    """palettes is a list of (outline_color, line_color, point_color[, background_color]) hex strings."""
+    if not palettes:
+        raise ValueError("At least one palette is needed")
     cpal = newTable('CPAL')
     cpal.version = 0
     cpal.numPaletteEntries = 4
-    cpal.palettes = [
-        [
-            hex_to_Color(background_color),
-            hex_to_Color(outline_color),
-            hex_to_Color(line_color),
-            hex_to_Color(point_color),
-        ],  # Palette 1
-    ]
-    tt_font['CPAL'] = cpal
+    cpal.palettes = [build_palette(*palette) for palette in palettes]
+    return cpal
 
-    # Create and populate the COLR table
+def colorize(tt_font, glyph_order, outline_color, line_color, point_color, background_color="#00000010", colr_version=0, palettes=None):
+    if palettes is None:
+        palettes = [(outline_color, line_color, point_color, background_color)]
+    tt_font['CPAL'] = build_cpal(palettes)
 
-    color_layer_lists = {}
-    suffixes = [(1, "_outlined"), (2, "_lines"), (3, "_handles"), (3, "_points")]
-    filled_suffixes = [(1, "_filled"), (2, "_lines"), (3, "_handles"), (3, "_points")]
-    bounds_suffixes = [(0, "_bounds"), (1, "_outlined"), (2, "_lines"), (3, "_handles"), (3, "_points")]
-    bounds_filled_suffixes = [(0, "_bounds"), (1, "_filled"), (2, "_lines"), (3, "_handles"), (3, "_points")]
+    if colr_version == 0:
+        tt_font['COLR'] = build_colr_v0(tt_font, glyph_order)
+    else:
+        tt_font['COLR'] = build_colr_v1(glyph_order)
 
+
+def build_colr_v0(tt_font, glyph_order):
+    """Write COLRv0 BaseGlyphRecord/LayerRecord arrays in glyph order.
+
+    Every source glyph gets one run of layer records
+    [_bounds, _outlined, _lines, _handles, _points, _bounds, _filled, _lines, _handles, _points]
+    and its four color glyphs point at overlapping slices of that run.
+    """
+    layer_records = []
+    base_glyph_records = []
     for glyph_name in glyph_order:
-        color_layer_lists[glyph_name] = [(glyph_name + suffix, index) for index, suffix in suffixes]
-        color_layer_lists[f"{glyph_name}.filled"] = [(glyph_name + suffix, index) for index, suffix in filled_suffixes]
-        color_layer_lists[f"{glyph_name}.bounds"] = [(glyph_name + suffix, index) for index, suffix in bounds_suffixes]
-        color_layer_lists[f"{glyph_name}.bounds.filled"] = [(glyph_name + suffix, index) for index, suffix in bounds_filled_suffixes]
+        first_index = len(layer_records)
+        for layer_name, palette_index in bounds_suffixes + bounds_filled_suffixes:
+            layer_record = ot.LayerRecord()
+            layer_record.LayerGlyph = glyph_name + layer_name
+            layer_record.PaletteIndex = palette_index
+            layer_records.append(layer_record)
+        for base_glyph, layer_index, num_layers in (
+            (glyph_name, first_index + 1, 4),
+            (f"{glyph_name}.bounds", first_index, 5),
+            (f"{glyph_name}.filled", first_index + 6, 4),
+            (f"{glyph_name}.bounds.filled", first_index + 5, 5),
+        ):
+            base_glyph_record = ot.BaseGlyphRecord()
+            base_glyph_record.BaseGlyph = base_glyph
+            base_glyph_record.FirstLayerIndex = layer_index
+            base_glyph_record.NumLayers = num_layers
+            base_glyph_records.append(base_glyph_record)
+    base_glyph_records.sort(key=lambda record: tt_font.getGlyphID(record.BaseGlyph))
 
+    table = ot.COLR()
+    table.Version = 0
+    table.BaseGlyphRecordCount = len(base_glyph_records)
+    table.BaseGlyphRecordArray = ot.BaseGlyphRecordArray()
+    table.BaseGlyphRecordArray.BaseGlyphRecord = base_glyph_records
+    table.LayerRecordCount = len(layer_records)
+    table.LayerRecordArray = ot.LayerRecordArray()
+    table.LayerRecordArray.LayerRecord = layer_records
 
-    colr = builder.buildCOLR(color_layer_lists)
+    colr = newTable('COLR')
+    colr.version = 0
+    colr.table = table
+    return colr
 
 
-    tt_font['COLR'] = colr
+def build_colr_v1(glyph_order):
+    """Build COLRv1, the shared layer tails are deduplicated into PaintColrLayers by colorLib."""
+    def paint_layers(glyph_name, layer_suffixes):
+        return {
+            "Format": ot.PaintFormat.PaintColrLayers,
+            "Layers": [
+                {
+                    "Format": ot.PaintFormat.PaintGlyph,
+                    "Glyph": glyph_name + suffix,
+                    "Paint": {"Format": ot.PaintFormat.PaintSolid, "PaletteIndex": index, "Alpha": 1.0},
+                }
+                for suffix, index in layer_suffixes
+            ],
+        }
 
-    # Save the modified font
\ No newline at end of file
+    color_glyphs = {}
+    for glyph_name in glyph_order:
+        color_glyphs[glyph_name] = paint_layers(glyph_name, suffixes)
+        color_glyphs[f"{glyph_name}.filled"] = paint_layers(glyph_name, filled_suffixes)
+        color_glyphs[f"{glyph_name}.bounds"] = paint_layers(glyph_name, bounds_suffixes)
+        color_glyphs[f"{glyph_name}.bounds.filled"] = paint_layers(glyph_name, bounds_filled_suffixes)
+    return builder.buildCOLR(color_glyphs, version=1)
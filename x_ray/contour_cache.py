@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from ufoLib2.objects.point import Point
+from ufoLib2.objects.contour import Contour
+from ufoLib2.objects.glyph import Glyph
+
+try:
+	from .glyph_store import object_size
+except ModuleNotFoundError:
+	from glyph_store import object_size
+
+
+def contour_key(contour, translation_step=None):
+	"""Point sequence of the contour relative to its first point.
+
+	With translation_step the origin is snapped down to a multiple of it.
+	"""
+	x0, y0 = contour.points[0].x, contour.points[0].y
+	if translation_step is not None:
+		x0, y0 = x0 - x0 % translation_step, y0 - y0 % translation_step
+	key = tuple((point.x - x0, point.y - y0, point.type) for point in contour.points)
+	return (x0, y0), key
+
+
+def translate_contours(contours, dx, dy):
+	output = []
+	for contour in contours:
+		output_contour = Contour()
+		output_contour.points = [Point(x + dx, y + dy, point_type, smooth) for x, y, point_type, smooth in contour]
+		output.append(output_contour)
+	return output
+
+
+class ContourCache:
+	"""Memoizes per-contour results inside a single build.
+
+	Contours are keyed by their translation-normalized point sequence, so
+	repeated accents, radicals and decomposed components are computed once
+	and reused with just an offset applied. The least recently used results
+	are dropped once they take more than memory_limit bytes.
+	"""
+
+	def __init__(self, memory_limit=64 * 1024 * 1024):
+		self.memory_limit = memory_limit
+		self.results = OrderedDict()
+		self.result_sizes = {}
+		self.cache_size = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, namespace, contour, compute, translation_step=None):
+		"""Return the contours compute() produces for contour, translated back in place.
+
+		compute gets a Glyph holding the contour moved to the origin and
+		returns a Glyph. namespace must hold every other input of compute.
+		translation_step limits the reuse to contours moved by its multiples,
+		for results that aren't invariant under any translation.
+		"""
+		(x0, y0), key = contour_key(contour, translation_step)
+		cache_key = (namespace, translation_step, key)
+		result = self.results.get(cache_key)
+		if result is None:
+			self.misses += 1
+			contour_glyph = Glyph()
+			contour_glyph.contours = translate_contours([[(x, y, point_type, False) for x, y, point_type in key]], 0, 0)
+			output_glyph = compute(contour_glyph)
+			result = [
+				[(point.x, point.y, point.type, point.smooth) for point in output_contour]
+				for output_contour in output_glyph.contours
+			]
+			self.store(cache_key, result)
+		else:
+			self.hits += 1
+			self.results.move_to_end(cache_key)
+		return translate_contours(result, x0, y0)
+
+	def store(self, cache_key, result):
+		size = object_size(result)
+		if size > self.memory_limit:
+			return
+		self.results[cache_key] = result
+		self.result_sizes[cache_key] = size
+		self.cache_size += size
+		while self.cache_size > self.memory_limit:
+			evicted_key, _ = self.results.popitem(last=False)
+			self.cache_size -= self.result_sizes.pop(evicted_key)
+			self.evictions += 1
+
+	@property
+	def hit_rate(self):
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0
+
+	def stats(self):
+		return dict(hits=self.hits, misses=self.misses, hit_rate=self.hit_rate, size=len(self.results), memory=self.cache_size, evictions=self.evictions)
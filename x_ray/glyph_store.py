@@ -0,0 +1,89 @@
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+
+def object_size(obj, seen=None):
+	"""Approximate memory taken by obj and everything it references, in bytes."""
+	if seen is None:
+		seen = set()
+	if id(obj) in seen:
+		return 0
+	seen.add(id(obj))
+	size = sys.getsizeof(obj)
+	if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+		return size
+	if isinstance(obj, dict):
+		for key, value in obj.items():
+			size += object_size(key, seen) + object_size(value, seen)
+	elif isinstance(obj, (list, tuple, set, frozenset)):
+		for item in obj:
+			size += object_size(item, seen)
+	if hasattr(obj, "__dict__"):
+		size += object_size(vars(obj), seen)
+	for cls in type(obj).__mro__:
+		for slot in getattr(cls, "__slots__", ()):
+			if slot != "__weakref__" and hasattr(obj, slot):
+				size += object_size(getattr(obj, slot), seen)
+	return size
+
+
+class GlyphStore:
+	"""Dict-like store that keeps glyphs in a file on disk.
+
+	Recently used glyphs are kept decoded in memory as long as their size
+	in memory stays under memory_limit bytes, the rest is read back on access.
+	"""
+
+	def __init__(self, path, memory_limit=64 * 1024 * 1024):
+		self.path = path
+		self.memory_limit = memory_limit
+		self.file = open(path, "w+b")
+		self.offsets = {}
+		self.cache = OrderedDict()
+		self.cache_size = 0
+
+	def __setitem__(self, key, glyph):
+		data = pickle.dumps(glyph, protocol=pickle.HIGHEST_PROTOCOL)
+		size = object_size(glyph)
+		self.file.seek(0, os.SEEK_END)
+		self.offsets[key] = (self.file.tell(), len(data), size)
+		self.file.write(data)
+		self.uncache(key)
+		self.cache_glyph(key, glyph, size)
+
+	def __getitem__(self, key):
+		if key in self.cache:
+			self.cache.move_to_end(key)
+			return self.cache[key][0]
+		offset, length, size = self.offsets[key]
+		self.file.seek(offset)
+		glyph = pickle.loads(self.file.read(length))
+		self.cache_glyph(key, glyph, size)
+		return glyph
+
+	def __contains__(self, key):
+		return key in self.offsets
+
+	def __len__(self):
+		return len(self.offsets)
+
+	def cache_glyph(self, key, glyph, size):
+		if size > self.memory_limit:
+			return
+		self.cache[key] = (glyph, size)
+		self.cache_size += size
+		while self.cache_size > self.memory_limit:
+			_, (_, evicted_size) = self.cache.popitem(last=False)
+			self.cache_size -= evicted_size
+
+	def uncache(self, key):
+		if key in self.cache:
+			_, size = self.cache.pop(key)
+			self.cache_size -= size
+
+	def close(self):
+		self.file.close()
+		self.cache.clear()
+		self.cache_size = 0
@@ -1,11 +1,17 @@
+import logging
 import math
 
-def calculate_offset(points, offset):
-	p0, p1, p2 = points
+logger = logging.getLogger(__name__)
+
 
+def calculate_offset_vector(p0, p1, p2, offset):
+	"""Offset vector for p1 of the polyline p0 - p1 - p2.
+
+	Raises ZeroDivisionError when p1 coincides with one of its neighbours.
+	"""
 	# Calculate vectors
-	v1 = (p0.x - p1.x, p0.y - p1.y)
-	v2 = (p2.x - p1.x, p2.y - p1.y)
+	v1 = (p0[0] - p1[0], p0[1] - p1[1])
+	v2 = (p2[0] - p1[0], p2[1] - p1[1])
 
 	# Normalize vectors
 	v1_length = math.sqrt(v1[0]**2 + v1[1]**2)
@@ -18,8 +24,8 @@ def calculate_offset(points, offset):
 	cross_product = v1_normalized[0] * v2_normalized[1] - v1_normalized[1] * v2_normalized[0]
 	
 	if abs(cross_product) < 1e-10:
-		# Handle collinear case
-		return (p1.x - offset * v1_normalized[1], p1.y + offset * v1_normalized[0])
+		# Handle collinear case, offset perpendicular to the incoming direction
+		return (-offset * v1_normalized[1], offset * v1_normalized[0])
 	
 	bisector = (v1_normalized[0] + v2_normalized[0], v1_normalized[1] + v2_normalized[1])
 	bisector_length = math.sqrt(bisector[0]**2 + bisector[1]**2)
@@ -30,63 +36,58 @@ def calculate_offset(points, offset):
 	angle = math.atan2(cross_product, dot_product)
 	factor = offset / math.sin(angle / 2)
 
-	return (p1.x + bisector_normalized[0] * factor, p1.y + bisector_normalized[1] * factor)
+	return (bisector_normalized[0] * factor, bisector_normalized[1] * factor)
+
+
+def calculate_offset(points, offset):
+	p0, p1, p2 = points
+	offset_x, offset_y = calculate_offset_vector((p0.x, p0.y), (p1.x, p1.y), (p2.x, p2.y), offset)
+	return (p1.x + offset_x, p1.y + offset_y)
+
+
+def same_position(point_a, point_b):
+	return point_a.x == point_b.x and point_a.y == point_b.y
 
 
 def get_simple_offsets(coordinates, offset):
 	num_points = len(coordinates)
 	offset_points = []
 	for i in range(num_points):
+		point = coordinates[i]
 		try:
 			points = [
 				coordinates[i - 1],
-				coordinates[i],
+				point,
 				coordinates[(i + 1) % num_points]
 			]
-			(offset_x, offset_y) = calculate_offset(points, offset)
+			offset_points.append(calculate_offset(points, offset))
+			continue
 		except ZeroDivisionError:
-			direction_is_back = True
-			if set([
-					coordinates[i].x,
-					coordinates[i].y,
-					coordinates[(i + 1) % num_points].x,
-					coordinates[(i + 1) % num_points].y
-				]) == 3:
-				direction_is_back = False
-			for point_offset in range(2, num_points):
-				if direction_is_back:
-					points = [
-						coordinates[i - point_offset],
-						coordinates[i],
-						coordinates[(i + 1) % num_points]
-					]
-				else:
-					points = [
-						coordinates[i - 1],
-						coordinates[i],
-						coordinates[(i + point_offset) % num_points]
-					]
-				try:
-					(offset_x, offset_y) = calculate_offset(points, offset)
-					break
-				except ZeroDivisionError:
-					pass
-		
-		try:
-			offset_points.append((offset_x, offset_y))
-		except NameError:
-			print("Couldn't find offset")
-			offset_points.append((0, 0))
+			pass
+
+		# zero-length segment, use the closest distinct neighbours instead
+		previous_points = (coordinates[i - step] for step in range(1, num_points))
+		next_points = (coordinates[(i + step) % num_points] for step in range(1, num_points))
+		previous_point = next((p for p in previous_points if not same_position(p, point)), None)
+		next_point = next((p for p in next_points if not same_position(p, point)), None)
+		if previous_point is None or next_point is None:
+			# every point of the contour is in the same place
+			logger.warning("Couldn't find offset for point (%s, %s), keeping it in place", point.x, point.y)
+			offset_points.append((point.x, point.y))
+		else:
+			offset_points.append(calculate_offset([previous_point, point, next_point], offset))
 
 	return offset_points
 
 
-def outline_glyph(glyph, offset_distance):
+def outline_glyph(glyph, offset_distance, truncate=True):
 	for contour in glyph:
 		offset = get_simple_offsets(contour, offset_distance)
 		for p, point in enumerate(contour):
 			x, y = offset[p]
-			point.x = int(x)
-			point.y = int(y)
+			if truncate:
+				x, y = int(x), int(y)
+			point.x = x
+			point.y = y
 
 
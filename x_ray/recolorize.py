@@ -1,5 +1,13 @@
+import os
 import struct
+import tempfile
 from io import BytesIO
+from fontTools.ttLib import TTFont
+
+try:
+    from .colorize import build_cpal
+except ModuleNotFoundError:
+    from colorize import build_cpal
 
 def load_font_data(font_path):
     with open(font_path, 'rb') as f:
@@ -55,21 +63,41 @@ def save_modified_font(new_font_data, output_path):
     with open(output_path, 'wb') as f:
         f.write(new_font_data)
 
-if __name__ == "__main__":
-    font_path = '0.ttf'
-    font_data = load_font_data(font_path)
-    cpal_offset = get_table_offset(font_data, 'CPAL')
-    palettes, version, num_palette_entries = read_cpal_table(font_data, cpal_offset)
+def set_palettes(font_path, palettes, output_path, append=False):
+    """Replace (or append to) the CPAL palettes of an already x-rayed font.
 
-    new_palettes = [[
-        (0, 0, 255, 255),
-        (0, 255, 0, 255),
-        (255, 0, 0, 255),
-        (0, 125, 255, 255),
-    ]]
+    Only CPAL is decompiled and rebuilt, all the other tables are copied as they are.
+    The font is written to a temporary file first, so output_path can be font_path.
+    """
+    output_directory = os.path.dirname(os.path.abspath(output_path))
+    file_descriptor, temporary_path = tempfile.mkstemp(suffix=".ttf", dir=output_directory)
+    os.close(file_descriptor)
+    try:
+        with TTFont(font_path, lazy=True) as font:
+            cpal = build_cpal(palettes)
+            if append:
+                cpal.palettes = font['CPAL'].palettes + cpal.palettes
+            font['CPAL'] = cpal
+            font.save(temporary_path)
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
 
+def main():
+    import argparse
 
-    new_font_data = update_palette_colors(font_data, cpal_offset, new_palettes, num_palette_entries)
+    parser = argparse.ArgumentParser(description="Replace or append palettes of x-rayed fonts")
+    parser.add_argument("font", help="Path to the x-rayed font file.")
+    parser.add_argument("--palette", dest="palettes", action="append", nargs="+", metavar="COLOR", required=True, help="Palette as OUTLINE LINE POINT [BACKGROUND] hex colors, can be repeated.")
+    parser.add_argument("--append", action="store_true", help="Append the palettes instead of replacing the existing ones.")
+    parser.add_argument("--output", help="Path to the output font file, defaults to overwriting the input.")
+    args = parser.parse_args()
+    for palette in args.palettes:
+        if len(palette) not in (3, 4):
+            parser.error("--palette takes OUTLINE LINE POINT [BACKGROUND] colors")
 
-    output_path = '0_modified.ttf'
-    save_modified_font(new_font_data, output_path)
+    set_palettes(args.font, args.palettes, args.output or args.font, append=args.append)
+
+if __name__ == "__main__":
+    main()
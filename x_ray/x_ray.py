@@ -12,16 +12,28 @@ from fontTools.designspaceLib import (
 	SourceDescriptor,
 	AxisDescriptor,
 )
-from ufo2ft import compileVariableTTF
+from ufo2ft import compileTTF, compileVariableTTF
+from ufo2ft.filters import BaseFilter, BaseIFilter
+from fontTools.cu2qu.ufo import glyphs_to_quadratic, DEFAULT_MAX_ERR
+from ufo2ft.outlineCompiler import OutlineTTFCompiler
+import logging
+import os
+import tempfile
 
 try:
-	from .outline_glyph import outline_glyph
+	from .outline_glyph import outline_glyph, calculate_offset_vector
 	from .normalizing_pen import NormalizingPen
 	from .colorize import colorize
+	from .contour_cache import ContourCache
+	from .glyph_store import GlyphStore
 except ModuleNotFoundError:
-	from outline_glyph import outline_glyph
+	from outline_glyph import outline_glyph, calculate_offset_vector
 	from normalizing_pen import NormalizingPen
 	from colorize import colorize
+	from contour_cache import ContourCache
+	from glyph_store import GlyphStore
+
+logger = logging.getLogger(__name__)
 
 def circle(layer, center, diameter, tension=1):
 	x, y = center
@@ -94,49 +106,6 @@ def normalize_angle(angle):
 	return angle
 
 
-def calculate_offset(p0, p1, p2, offset):
-
-	# Calculate vectors
-	v1 = (p0[0] - p1[0], p0[1] - p1[1])
-	v2 = (p2[0] - p1[0], p2[1] - p1[1])
-
-	# Normalize vectors
-	v1_length = sqrt(v1[0] ** 2 + v1[1] ** 2)
-	v2_length = sqrt(v2[0] ** 2 + v2[1] ** 2)
-
-	v1_normalized = (v1[0] / v1_length, v1[1] / v1_length)
-	v2_normalized = (v2[0] / v2_length, v2[1] / v2_length)
-
-	# Check for collinearity (cross product close to zero)
-	cross_product = (
-		v1_normalized[0] * v2_normalized[1] - v1_normalized[1] * v2_normalized[0]
-	)
-
-	if abs(cross_product) < 1e-10:
-		# Handle collinear case
-		offset_x = offset * v1_normalized[1]  # Perpendicular offset direction
-		offset_y = offset * v1_normalized[0]  # Perpendicular offset direction
-		return (offset_x, offset_y)
-
-	bisector = (
-		v1_normalized[0] + v2_normalized[0],
-		v1_normalized[1] + v2_normalized[1],
-	)
-	bisector_length = sqrt(bisector[0] ** 2 + bisector[1] ** 2)
-	bisector_normalized = (bisector[0] / bisector_length, bisector[1] / bisector_length)
-
-	# Calculate the angle between v1 and v2
-	dot_product = (
-		v1_normalized[0] * v2_normalized[0] + v1_normalized[1] * v2_normalized[1]
-	)
-	angle = atan2(cross_product, dot_product)
-	factor = offset / sin(angle / 2)
-
-	# Calculate offset point
-	offset_x = bisector_normalized[0] * factor
-	offset_y = bisector_normalized[1] * factor
-	return (offset_x, offset_y)
-
 def calculate_end_offset(p0, p1, offset):
 	"""Calculate the offset point for the end of a contour."""
 	v = (p1[0] - p0[0], p1[1] - p0[1])
@@ -216,6 +185,11 @@ class XRayPen(AbstractPen):
 			line_width = self.size / 2
 
 			points = [self.last_point] + list(points)
+			# drop zero-length segments, they have no direction to offset along
+			points = [point for p, point in enumerate(points) if p == 0 or tuple(point) != tuple(points[p - 1])]
+			if len(points) == 2:
+				line_shape(self.layer, points[0], points[1], self.size)
+				points = []
 			outer_points = []
 			inner_points = []
 			points_len = len((points))
@@ -231,8 +205,8 @@ class XRayPen(AbstractPen):
 					inner_points.append(add_offset(prev_point, offset_inner))
 					outer_points.append(add_offset(prev_point, offset_outer))
 
-				offset_inner = calculate_offset(prev_point, point, next_point, line_width)
-				offset_outer = calculate_offset(prev_point, point, next_point, -line_width)
+				offset_inner = calculate_offset_vector(prev_point, point, next_point, line_width)
+				offset_outer = calculate_offset_vector(prev_point, point, next_point, -line_width)
 				outer_points.append(add_offset(point, offset_outer))
 				inner_points.append(add_offset(point, offset_inner))
 				
@@ -244,11 +218,11 @@ class XRayPen(AbstractPen):
 					outer_points.append(add_offset(next_point, offset_outer))
 			
 			points = inner_points + outer_points[::-1]
-			contour = Contour()
-			for x, y in points:
-				contour.points.append(Point(x, y, "line"))
-			# print(contour)
-			self.layer.contours.append(contour)
+			if points:
+				contour = Contour()
+				for x, y in points:
+					contour.points.append(Point(x, y, "line"))
+				self.layer.contours.append(contour)
 		self.last_point = last_point
 		self.point(last_point)
 
@@ -298,22 +272,103 @@ def copy_data_from_glyph(source, destination, exclude=[]):
 	if "unicodes" in exclude:
 		destination.unicodes = []
 	if "contours" not in exclude:
-		destination.contours = []
-		destination.contours = source.contours
+		# the contours are shared, the list isn't, so the destination can be edited in place
+		destination.contours = list(source.contours)
 	return destination
 
 
-def process_outline(glyph, outline_width):
-	outlined_glyph_inner = copy_data_from_glyph(glyph.copy(), Glyph())
-	outlined_glyph_outer = copy_data_from_glyph(glyph.copy(), Glyph())
-	outline_glyph(outlined_glyph_inner, -outline_width/2)
-	outline_glyph(outlined_glyph_outer, outline_width/2)
+def is_composite(glyph):
+	return bool(glyph.components) and not glyph.contours
+
+
+def glyph_processing_order(font):
+	"""Glyph names ordered so base glyphs come before the composites using them."""
+	order = []
+	visited = set()
+	in_progress = set()
+
+	def visit(glyph_name, composite_name=None):
+		if glyph_name in visited:
+			return
+		if glyph_name not in font:
+			logger.warning("Glyph %s uses missing component %s, skipping it", composite_name, glyph_name)
+			return
+		if glyph_name in in_progress:
+			logger.warning("Glyph %s is part of a component cycle, skipping it", glyph_name)
+			return
+		in_progress.add(glyph_name)
+		for component in font[glyph_name].components:
+			visit(component.baseGlyph, glyph_name)
+		in_progress.remove(glyph_name)
+		visited.add(glyph_name)
+		order.append(glyph_name)
+
+	for glyph_name in font.keys():
+		visit(glyph_name)
+	return order
+
+
+def copy_components(source, destination):
+	for component in source.components:
+		destination.components.append(Component(component.baseGlyph, component.transformation))
+
+
+def normalize_contour(contour_glyph, zero_handles_distance_fix):
+	normalized_glyph = Glyph()
+	normalizing_pen = NormalizingPen(normalized_glyph.getPen(), zero_handles_distance_fix=zero_handles_distance_fix)
+	contour_glyph.draw(normalizing_pen)
+	return normalized_glyph
+
+
+def normalize_glyph(glyph, zero_handles_distance_fix, contour_cache=None):
+	contour_cache = contour_cache or ContourCache()
+	normalized_glyph = Glyph()
+	for contour in glyph.contours:
+		normalized_glyph.contours += contour_cache.get(
+			("normalize", zero_handles_distance_fix),
+			contour,
+			lambda contour_glyph: normalize_contour(contour_glyph, zero_handles_distance_fix),
+			# NormalizingPen rounds half to even, which only commutes with even moves
+			translation_step=2,
+		)
+	copy_components(glyph, normalized_glyph)
+	return normalized_glyph
+
+
+def outline_contour(contour_glyph, outline_width):
+	outlined_glyph_inner = copy_data_from_glyph(contour_glyph.copy(), Glyph())
+	outlined_glyph_outer = copy_data_from_glyph(contour_glyph.copy(), Glyph())
+	outline_glyph(outlined_glyph_inner, -outline_width/2, truncate=False)
+	outline_glyph(outlined_glyph_outer, outline_width/2, truncate=False)
 	output_glyph = Glyph()
 	reverse_contour_pen = ReverseContourPen(output_glyph.getPen())
 	outlined_glyph_inner.draw(reverse_contour_pen)
 	outlined_glyph_outer.draw(output_glyph.getPen())
 	return output_glyph
 
+
+def process_outline(glyph, outline_width, contour_cache=None):
+	contour_cache = contour_cache or ContourCache()
+	inner_contours = []
+	outer_contours = []
+	for contour in glyph.contours:
+		inner_contour, outer_contour = contour_cache.get(
+			("outline", outline_width),
+			contour,
+			lambda contour_glyph: outline_contour(contour_glyph, outline_width),
+		)
+		inner_contours.append(inner_contour)
+		outer_contours.append(outer_contour)
+	# offsets are truncated only after moving the contour back in place
+	for contour in inner_contours + outer_contours:
+		for point in contour:
+			point.x = int(point.x)
+			point.y = int(point.y)
+	output_glyph = Glyph()
+	output_glyph.contours = inner_contours + outer_contours
+	copy_components(glyph, output_glyph)
+	return output_glyph
+
 def process_point(glyph, point_size):
 	point_layer = Glyph()
 	x_ray_pen = XRayPen(
@@ -337,7 +392,7 @@ def process_handle(glyph, handle_size):
 	glyph.draw(x_ray_pen)
 	return handle_layer
 
-def process_line(glyph, line_width):
+def line_contour(contour_glyph, line_width):
 	handle_line_layer = Glyph()
 	x_ray_pen = XRayPen(
 		handle_line_layer,
@@ -345,10 +400,176 @@ def process_line(glyph, line_width):
 		process="handle_lines",
 		use_components=True
 	)
-	glyph.draw(x_ray_pen)
+	contour_glyph.draw(x_ray_pen)
+	return handle_line_layer
+
+
+def process_line(glyph, line_width, contour_cache=None):
+	contour_cache = contour_cache or ContourCache()
+	handle_line_layer = Glyph()
+	for contour in glyph.contours:
+		handle_line_layer.contours += contour_cache.get(
+			("line", line_width),
+			contour,
+			lambda contour_glyph: line_contour(contour_glyph, line_width),
+		)
+	copy_components(glyph, handle_line_layer)
 	return handle_line_layer
 
-def x_ray(font, outline_color="#0000FF", line_color="#00FF00", point_color="#FF0000"):
+
+# The axes and the "point"/"handle" glyphs are rebuilt for every build on
+# purpose: they take about 1 ms of a 300 ms build of a 5 glyph font, the rest
+# is ufo2ft and varLib compiling the masters together, which no cached or
+# precompiled template can skip.
+AXES = (
+	# name, tag, label, minimum, maximum
+	("outline_width", "OTLN", "Outline width", 1, 20),
+	("line_width", "LINE", "Line width", 1, 20),
+	("point_size", "POIN", "Point size", 10, 40),
+	("handle_size", "HAND", "Handle size", 10, 40),
+)
+
+# per-glyph layers and the axis each of them varies along
+LAYER_AXES = (
+	("outlined", "outline_width"),
+	("points", "point_size"),
+	("handles", "handle_size"),
+	("lines", "line_width"),
+)
+
+
+def check_static_location(static_location):
+	"""Raise ValueError for unknown axes and values outside their range."""
+	axis_ranges = {name: (minimum, maximum) for name, _, _, minimum, maximum in AXES}
+	for axis_name, value in static_location.items():
+		if axis_name not in axis_ranges:
+			raise ValueError(f"Unknown axis {axis_name!r}, expected one of {', '.join(axis_ranges)}")
+		minimum, maximum = axis_ranges[axis_name]
+		if not minimum <= value <= maximum:
+			raise ValueError(f"{axis_name} must be between {minimum} and {maximum}, got {value}")
+
+
+class XRayCancelled(Exception):
+	"""Raised when a build is aborted through its cancel event."""
+
+
+def check_cancelled(cancel_event):
+	if cancel_event is not None and cancel_event.is_set():
+		raise XRayCancelled("x-ray build was cancelled")
+
+
+def report_progress(progress_callback, stage, done, total):
+	if progress_callback is not None:
+		progress_callback(stage, done, total)
+
+
+# glyphs between progress reports from inside ufo2ft, which sees every glyph of every master
+PROGRESS_BATCH = 64
+
+
+class CompileProgressFilter(BaseFilter):
+	"""Reports every glyph before ufo2ft preprocesses it and checks the cancel event."""
+
+	_kwargs = {
+		"progress_callback": None,
+		"cancel_event": None,
+		"total": 0,
+	}
+
+	def start(self):
+		self.done = 0
+
+	def filter(self, glyph):
+		self.done += 1
+		if self.done % PROGRESS_BATCH == 0 or self.done == self.options.total:
+			check_cancelled(self.options.cancel_event)
+			report_progress(self.options.progress_callback, "prepare", self.done, self.options.total)
+		return False
+
+
+class QuadraticProgressIFilter(BaseIFilter):
+	"""Converts the masters' curves to quadratic one glyph at a time.
+
+	Does the same as ufo2ft's own conversion (which is turned off), but
+	reports progress and checks the cancel event between glyphs.
+	"""
+
+	_kwargs = {
+		"progress_callback": None,
+		"cancel_event": None,
+		"total": 0,
+	}
+
+	def set_context(self, fonts, glyphSets, *args, **kwargs):
+		context = super().set_context(fonts, glyphSets, *args, **kwargs)
+		context.done = 0
+		context.max_errors = [DEFAULT_MAX_ERR * font.info.unitsPerEm for font in fonts]
+		return context
+
+	def filter(self, glyphName, glyphs):
+		check_cancelled(self.options.cancel_event)
+		modified = glyphs_to_quadratic(glyphs, max_err=self.context.max_errors[:len(glyphs)], reverse_direction=True)
+		self.context.done += 1
+		if self.context.done % PROGRESS_BATCH == 0 or self.context.done == self.options.total:
+			report_progress(self.options.progress_callback, "quadratic", self.context.done, self.options.total)
+		return modified
+
+
+def compile_progress_outline_compiler(progress_callback, cancel_event, total, release_outlines=False):
+	"""OutlineTTFCompiler subclass reporting each compiled master as its glyph count.
+
+	With release_outlines the contours of each master's glyph set are dropped
+	once it is compiled, they aren't needed for the rest of the build.
+	"""
+	done = 0
+
+	class ProgressOutlineTTFCompiler(OutlineTTFCompiler):
+		def compile(self):
+			tt_font = super().compile()
+			if release_outlines:
+				for glyph in self.allGlyphs.values():
+					if isinstance(glyph, Glyph):
+						glyph.contours = []
+			return tt_font
+
+		def compileGlyphs(self):
+			nonlocal done
+			check_cancelled(cancel_event)
+			tt_glyphs = super().compileGlyphs()
+			done += len(tt_glyphs)
+			report_progress(progress_callback, "compile", min(done, total), total)
+			return tt_glyphs
+
+	return ProgressOutlineTTFCompiler
+
+
+def x_ray(font, outline_color="#0000FF", line_color="#00FF00", point_color="#FF0000", palettes=None, colr_version=0, static_location=None, contour_cache=None, low_memory=False, memory_limit=64 * 1024 * 1024, progress_callback=None, cancel_event=None):
+	"""X-ray the font into a variable COLR font.
+
+	progress_callback is called as progress_callback(stage, done, total) for
+	every processed glyph/master, also while ufo2ft compiles. cancel_event is anything with an is_set()
+	method (e.g. threading.Event); it is checked between glyphs and stages
+	and XRayCancelled is raised once it is set. palettes is an optional list
+	of (outline_color, line_color, point_color[, background_color]) tuples,
+	each becoming one CPAL palette; the first one is the default.
+	colr_version selects between a COLRv0 table and a COLRv1 table with
+	shared PaintColrLayers. static_location, a dict keyed by axis name
+	(outline_width, line_width, point_size, handle_size; missing axes use
+	their default, unknown axes or values outside the axis range raise
+	ValueError), builds a static font for just that location instead of
+	the variable one. contour_cache is the ContourCache used to reuse
+	repeated contours, by default one holding up to 64 MB of results; pass
+	one in to set its memory_limit or to read its stats() after the build.
+	low_memory lowers the peak memory use: the processed layer glyphs are
+	kept in a temporary file, with an LRU of at most memory_limit bytes of
+	them in memory, the shared contour cache is skipped unless one is passed
+	in, and ufo2ft edits the masters in place instead of copying them and
+	drops each master's outlines once it is compiled. memory_limit only
+	bounds that LRU, not the whole build.
+	"""
+	if static_location is not None:
+		check_static_location(static_location)
+
 	y_min = font.info.descender
 	y_max = font.info.ascender 
 	for glyph in font:
@@ -375,152 +596,286 @@ def x_ray(font, outline_color="#0000FF", line_color="#00FF00", point_color="#FF0
 
 	doc = DesignSpaceDocument()
 
-	axis_outline = AxisDescriptor()
-	axis_outline.minimum = 1
-	axis_outline.maximum = 20
-	axis_outline.default = axis_outline.minimum
-	axis_outline.name = "outline_width"
-	axis_outline.tag = "OTLN"
-	axis_outline.labelNames = dict(en="Outline width")
-	doc.addAxis(axis_outline)
-
-	axis_line = AxisDescriptor()
-	axis_line.minimum = 1
-	axis_line.maximum = 20
-	axis_line.default = axis_line.minimum
-	axis_line.name = "line_width"
-	axis_line.tag = "LINE"
-	axis_line.labelNames = dict(en="Line width")
-	doc.addAxis(axis_line)
-
-	axis_point = AxisDescriptor()
-	axis_point.minimum = 10
-	axis_point.maximum = 40
-	axis_point.default = axis_point.minimum
-	axis_point.name = "point_size"
-	axis_point.tag = "POIN"
-	axis_point.labelNames = dict(en="Point size")
-	doc.addAxis(axis_point)
-
-	axis_handle = AxisDescriptor()
-	axis_handle.minimum = 10
-	axis_handle.maximum = 40
-	axis_handle.default = axis_handle.minimum
-	axis_handle.name = "handle_size"
-	axis_handle.tag = "HAND"
-	axis_handle.labelNames = dict(en="Handle size")
-	doc.addAxis(axis_handle)
-
-
-	normalized_glyphs = {}
-	outlined_glyphs = {}
-	point_glyphs = {}
-	handle_glyphs = {}
-	handle_line_glyphs = {}
+	for name, tag, label, minimum, maximum in AXES:
+		axis = AxisDescriptor()
+		axis.minimum = minimum
+		axis.maximum = maximum
+		axis.default = axis.minimum
+		axis.name = name
+		axis.tag = tag
+		axis.labelNames = dict(en=label)
+		doc.addAxis(axis)
+
+	axis_values = {}
+	for axis in doc.axes:
+		if static_location is None:
+			axis_values[axis.name] = [axis.minimum, axis.maximum]
+		else:
+			axis_values[axis.name] = [static_location.get(axis.name, axis.default)]
+
+	if contour_cache is None and not low_memory:
+		contour_cache = ContourCache()
+
+	# layer glyphs keyed by (layer, axis value, glyph name), normalized glyphs by ("normalized", glyph name)
+	if low_memory:
+		temporary_directory = tempfile.TemporaryDirectory(prefix="x_ray_")
+		layer_glyphs = GlyphStore(os.path.join(temporary_directory.name, "layers"), memory_limit=memory_limit)
+	else:
+		temporary_directory = None
+		layer_glyphs = {}
+
+	try:
+		processing_order = glyph_processing_order(font)
+		glyph_count = len(processing_order)
+		for glyph_index, glyph_name in enumerate(processing_order):
+			check_cancelled(cancel_event)
+			glyph = font[glyph_name]
+			if not is_composite(glyph):
+				layer_glyphs["normalized", glyph_name] = normalize_glyph(glyph, 10*drawing_scale_factor, contour_cache)
+			report_progress(progress_callback, "normalize", glyph_index + 1, glyph_count)
+
+		for glyph_index, glyph_name in enumerate(processing_order):
+			check_cancelled(cancel_event)
+			glyph = font[glyph_name]
+			if is_composite(glyph):
+				# every layer of a composite is just its components, which get
+				# the layer suffix in the masters, so there is no geometry to compute
+				composite_layer = Glyph()
+				copy_components(glyph, composite_layer)
+				for layer, axis_name in LAYER_AXES:
+					for value in axis_values[axis_name]:
+						layer_glyphs[layer, value, glyph_name] = composite_layer
+				report_progress(progress_callback, "process", glyph_index + 1, glyph_count)
+				continue
+
+			normalized_glyph = layer_glyphs["normalized", glyph_name]
+			for outline_width in axis_values["outline_width"]:
+				output_glyph = process_outline(normalized_glyph, outline_width * drawing_scale_factor, contour_cache)
+				layer_glyphs["outlined", outline_width, glyph_name] = output_glyph
+
+			for point_size in axis_values["point_size"]:
+				output_glyph = process_point(glyph, point_size * drawing_scale_factor)
+				layer_glyphs["points", point_size, glyph_name] = output_glyph
+
+			for handle_size in axis_values["handle_size"]:
+				output_glyph = process_handle(glyph, handle_size * drawing_scale_factor)
+				layer_glyphs["handles", handle_size, glyph_name] = output_glyph
+
+			for line_width in axis_values["line_width"]:
+				output_glyph = process_line(glyph, line_width * drawing_scale_factor, contour_cache)
+				layer_glyphs["lines", line_width, glyph_name] = output_glyph
+			report_progress(progress_callback, "process", glyph_index + 1, glyph_count)
+
+		# kerning and features are the same for every master
+		features_template = Font()
+		add_features(font, features_template)
+
+		masters = {}
+		for point_size in axis_values["point_size"]:
+			for handle_size in axis_values["handle_size"]:
+				for outline_width in axis_values["outline_width"]:
+					for line_width in axis_values["line_width"]:
+						master = Font()
+						master.info.unitsPerEm = new_upm
+						master.info.ascender = font.info.ascender
+						master.info.descender = font.info.descender
+						master.info.capHeight = font.info.capHeight
+						master.info.xHeight = font.info.xHeight
+
+						master.kerning.update(features_template.kerning)
+						master.features.text = features_template.features.text
+						masters[point_size, handle_size, outline_width, line_width] = master
+
+		# glyph by glyph, so every layer glyph is read once and shared by the masters using it
+		for glyph_index, glyph_name in enumerate(font.keys()):
+			check_cancelled(cancel_event)
+			glyph_layers = {
+				(layer, value): layer_glyphs[layer, value, glyph_name]
+				for layer, axis_name in LAYER_AXES
+				for value in axis_values[axis_name]
+			}
+			for (point_size, handle_size, outline_width, line_width), master in masters.items():
+				copy_data_from_glyph(glyph_layers["outlined", outline_width], master.newGlyph(glyph_name + "_outlined"), exclude=["unicodes"])
+				copy_data_from_glyph(glyph_layers["points", point_size], master.newGlyph(glyph_name + "_points"), exclude=["unicodes"])
+				copy_data_from_glyph(glyph_layers["handles", handle_size], master.newGlyph(glyph_name + "_handles"), exclude=["unicodes"])
+				copy_data_from_glyph(glyph_layers["lines", line_width], master.newGlyph(glyph_name + "_lines"), exclude=["unicodes"])
+				copy_data_from_glyph(font[glyph_name], master.newGlyph(glyph_name), exclude=["contours"])
+				copy_data_from_glyph(font[glyph_name], master.newGlyph(glyph_name + "_filled"), exclude=["unicodes"])
+			
+				filled = master.newGlyph(glyph_name + ".filled")
+				filled.width = font[glyph_name].width
+				for suffix in ["_filled", "_lines", "_points", "_handles"]:
+					filled.components.append(Component(glyph_name + suffix, (1, 0, 0, 1, 0, 0)))
+
+				for suffix in ["_lines", "_outlined", "_points", "_handles"]:
+					duplicate_components(master[glyph_name + suffix], suffix)
+
+				master.newGlyph(glyph_name + ".bounds").width = font[glyph_name].width
+				bounds_pen = master.newGlyph(glyph_name + "_bounds").getPen()
+				bounds_pen.moveTo((0, font.info.descender))
+				bounds_pen.lineTo((0, font.info.ascender))
+				bounds_pen.lineTo((font[glyph_name].width, font.info.ascender))
+				bounds_pen.lineTo((font[glyph_name].width, font.info.descender))
+				bounds_pen.closePath()
+				master.newGlyph(glyph_name + ".bounds.filled").width = font[glyph_name].width
+
+				default_glyph = master[glyph_name]
+				default_glyph.contours = []
+				default_glyph.components = []
+				for suffix in ["_lines", "_outlined"]:
+					default_glyph.contours += master[glyph_name + suffix].contours[::1]
+				for suffix in ["_handles", "_points"]:
+					master[glyph_name].components += master[glyph_name + suffix].components[::1]
+			report_progress(progress_callback, "masters", glyph_index + 1, glyph_count)
+
+		for (point_size, handle_size, outline_width, line_width), master in masters.items():
+			square(master.newGlyph("point"), (0, 0), point_size * drawing_scale_factor)
+			circle(master.newGlyph("handle"), (0, 0), handle_size * drawing_scale_factor, tension=0.66)
+
+			source = SourceDescriptor()
+			source.font = master
+			source.location = dict(
+				outline_width=outline_width,
+				line_width=line_width,
+				point_size=point_size,
+				handle_size=handle_size,
+			)
+			doc.addSource(source)
+		del masters, glyph_layers
+
+		if low_memory:
+			# the masters hold everything the compilation needs from here on
+			layer_glyphs.close()
+
+		check_cancelled(cancel_event)
+		master_glyph_count = len(doc.sources[0].font)
+		prepare_filter = CompileProgressFilter(progress_callback=progress_callback, cancel_event=cancel_event, total=master_glyph_count * len(doc.sources), pre=True)
+		outline_compiler_class = compile_progress_outline_compiler(progress_callback, cancel_event, master_glyph_count * len(doc.sources), release_outlines=low_memory)
+		if static_location is None:
+			compiled = compileVariableTTF(
+				doc,
+				optimizeGvar=False,
+				convertCubics=False,
+				reverseDirection=False,
+				filters=[prepare_filter, ..., QuadraticProgressIFilter(progress_callback=progress_callback, cancel_event=cancel_event, total=master_glyph_count)],
+				outlineCompilerClass=outline_compiler_class,
+				# the masters are throwaway, so low memory mode lets ufo2ft edit them instead of copying
+				inplace=low_memory,
+			)
+		else:
+			compiled = compileTTF(
+				doc.sources[0].font,
+				filters=[prepare_filter, ...],
+				outlineCompilerClass=outline_compiler_class,
+				inplace=low_memory,
+			)
+	finally:
+		if low_memory:
+			doc.sources = []
+			layer_glyphs.close()
+			temporary_directory.cleanup()
+
+	check_cancelled(cancel_event)
+	report_progress(progress_callback, "colorize", 0, 1)
+	colorize(compiled, font.keys(), outline_color=outline_color, line_color=line_color, point_color=point_color, colr_version=colr_version, palettes=palettes)
+	report_progress(progress_callback, "colorize", 1, 1)
+	return compiled
 
 
-	for glyph in font:
-		normalized_glyph = Glyph()
-		normalizing_pen = NormalizingPen(normalized_glyph.getPen(), zero_handles_distance_fix=10*drawing_scale_factor)
-		glyph.draw(normalizing_pen)
-		normalized_glyphs[glyph.name] = normalized_glyph
+class ProgressPrinter:
+	"""Prints stage progress with glyphs/sec and ETA to stderr.
 
-	for glyph_name in font.keys():
-		glyph = font[glyph_name]
-		normalized_glyph = normalized_glyphs[glyph_name]
-		for outline_width in [axis_outline.minimum, axis_outline.maximum]:
-			output_glyph = process_outline(normalized_glyph, outline_width * drawing_scale_factor)
-			outlined_glyphs.setdefault(outline_width, {})[glyph_name] = output_glyph
-
-		for point_size in [axis_point.minimum, axis_point.maximum]:
-			output_glyph = process_point(glyph, point_size * drawing_scale_factor)
-			point_glyphs.setdefault(point_size, {})[glyph_name] = output_glyph
-
-		for handle_size in [axis_handle.minimum, axis_handle.maximum]:
-			output_glyph = process_handle(glyph, handle_size * drawing_scale_factor)
-			handle_glyphs.setdefault(handle_size, {})[glyph_name] = output_glyph
-
-		for line_width in [axis_line.minimum, axis_line.maximum]:
-			output_glyph = process_line(glyph, line_width * drawing_scale_factor)
-			handle_line_glyphs.setdefault(line_width, {})[glyph_name] = output_glyph
-
-	for point_size in [axis_point.minimum, axis_point.maximum]:
-		for handle_size in [axis_handle.minimum, axis_handle.maximum]:
-			for outline_width in [axis_outline.minimum, axis_outline.maximum]:
-				for line_width in [axis_line.minimum, axis_line.maximum]:
-					master = Font()
-					master.info.unitsPerEm = new_upm
-					master.info.ascender = font.info.ascender
-					master.info.descender = font.info.descender
-					master.info.capHeight = font.info.capHeight
-					master.info.xHeight = font.info.xHeight
-
-					add_features(font, master)
-
-					for glyph_name in font.keys():
-						copy_data_from_glyph(outlined_glyphs[outline_width][glyph_name], master.newGlyph(glyph_name + "_outlined"), exclude=["unicodes"])
-						copy_data_from_glyph(point_glyphs[point_size][glyph_name], master.newGlyph(glyph_name + "_points"), exclude=["unicodes"])
-						copy_data_from_glyph(handle_glyphs[handle_size][glyph_name], master.newGlyph(glyph_name + "_handles"), exclude=["unicodes"])
-						copy_data_from_glyph(handle_line_glyphs[line_width][glyph_name], master.newGlyph(glyph_name + "_lines"), exclude=["unicodes"])
-						copy_data_from_glyph(font[glyph_name], master.newGlyph(glyph_name), exclude=["contours"])
-						copy_data_from_glyph(font[glyph_name], master.newGlyph(glyph_name + "_filled"), exclude=["unicodes"])
-						
-						filled = master.newGlyph(glyph_name + ".filled")
-						filled.width = font[glyph_name].width
-						for suffix in ["_filled", "_lines", "_points", "_handles"]:
-							filled.components.append(Component(glyph_name + suffix, (1, 0, 0, 1, 0, 0)))
-
-						for suffix in ["_lines", "_outlined", "_points", "_handles"]:
-							duplicate_components(master[glyph_name + suffix], suffix)
-
-						master.newGlyph(glyph_name + ".bounds").width = font[glyph_name].width
-						bounds_pen = master.newGlyph(glyph_name + "_bounds").getPen()
-						bounds_pen.moveTo((0, font.info.descender))
-						bounds_pen.lineTo((0, font.info.ascender))
-						bounds_pen.lineTo((font[glyph_name].width, font.info.ascender))
-						bounds_pen.lineTo((font[glyph_name].width, font.info.descender))
-						bounds_pen.closePath()
-						master.newGlyph(glyph_name + ".bounds.filled").width = font[glyph_name].width
-
-						default_glyph = master[glyph_name]
-						default_glyph.contours = []
-						default_glyph.components = []
-						for suffix in ["_lines", "_outlined"]:
-							default_glyph.contours += master[glyph_name + suffix].contours[::1]
-						for suffix in ["_handles", "_points"]:
-							master[glyph_name].components += master[glyph_name + suffix].components[::1]
-
-					square(master.newGlyph("point"), (0, 0), point_size * drawing_scale_factor)
-					circle(master.newGlyph("handle"), (0, 0), handle_size * drawing_scale_factor, tension=0.66)
-
-					source = SourceDescriptor()
-					source.font = master
-					source.location = dict(
-						outline_width=outline_width,
-						line_width=line_width,
-						point_size=point_size,
-						handle_size=handle_size,
-					)
-					doc.addSource(source)
-
-	compiled = compileVariableTTF(doc, optimizeGvar=False)
-	colorize(compiled, font.keys(), outline_color=outline_color, line_color=line_color, point_color=point_color)
-	return compiled
+	Redraws at most every interval seconds, apart from the first and last
+	update of each stage.
+	"""
+
+	def __init__(self, stream=None, interval=0.1):
+		import sys
+		self.stream = stream or sys.stderr
+		self.interval = interval
+		self.stage = None
+		self.stage_start = None
+		self.last_draw = None
+
+	def __call__(self, stage, done, total):
+		from time import perf_counter
+		now = perf_counter()
+		if stage != self.stage:
+			if self.stage is not None:
+				self.stream.write("\n")
+			self.stage = stage
+			self.stage_start = now
+		elif done < total and now - self.last_draw < self.interval:
+			return
+		self.last_draw = now
+		elapsed = now - self.stage_start
+		rate = done / elapsed if elapsed > 0 else 0
+		eta = (total - done) / rate if rate else 0
+		if stage in ("normalize", "process", "masters", "prepare", "quadratic", "compile"):
+			self.stream.write(f"\r{stage}: {done}/{total} glyphs, {rate:.1f} glyphs/s, ETA {eta:.1f}s ")
+		elif done < total:
+			self.stream.write(f"\r{stage}: {done}/{total} ")
+		else:
+			self.stream.write(f"\r{stage}: {done}/{total} in {elapsed:.2f}s ")
+		self.stream.flush()
+
+	def finish(self):
+		if self.stage is not None:
+			self.stream.write("\n")
+			self.stream.flush()
 
 
 def main():
 	from pathlib import Path
 	import argparse
+	import sys
 
 	parser = argparse.ArgumentParser(description="X-ray fonts")
 	parser.add_argument("ufo", type=Font.open, help="Path to the input font file.")
 	parser.add_argument("--glyph_names", nargs="+", help="List of glyph names to process.")
+	parser.add_argument("--palette", dest="palettes", action="append", nargs="+", metavar="COLOR", help="Palette as OUTLINE LINE POINT [BACKGROUND] hex colors, can be repeated.")
+	parser.add_argument("--colr_version", type=int, choices=[0, 1], default=0, help="Version of the COLR table to build.")
+	parser.add_argument("--static", action="store_true", help="Build a static font for one axis location instead of a variable font.")
+	parser.add_argument("--outline_width", type=float, help="Outline width of the static font.")
+	parser.add_argument("--line_width", type=float, help="Line width of the static font.")
+	parser.add_argument("--point_size", type=float, help="Point size of the static font.")
+	parser.add_argument("--handle_size", type=float, help="Handle size of the static font.")
+	parser.add_argument("--low_memory", action="store_true", help="Lower peak memory use: keep processed layer glyphs on disk and compile the masters in place.")
+	parser.add_argument("--memory_limit", type=int, default=64, help="Megabytes of processed layer glyphs cached in memory in --low_memory mode (not a limit for the whole build).")
+	parser.add_argument("--quiet", action="store_true", help="Don't report progress.")
 	args = parser.parse_args()
+	for palette in args.palettes or []:
+		if len(palette) not in (3, 4):
+			parser.error("--palette takes OUTLINE LINE POINT [BACKGROUND] colors")
 	
 	ufo = args.ufo
 	ufo_path = Path(ufo.path)
 	
-	x_rayed_ufo = x_ray(ufo)
+	static_location = None
+	for axis_name, _, _, minimum, maximum in AXES:
+		value = getattr(args, axis_name)
+		if value is None:
+			continue
+		if not args.static:
+			parser.error(f"--{axis_name} can only be used with --static")
+		if not minimum <= value <= maximum:
+			parser.error(f"--{axis_name} must be between {minimum} and {maximum}")
+	if args.static:
+		static_location = {
+			axis_name: getattr(args, axis_name)
+			for axis_name, *_ in AXES
+			if getattr(args, axis_name) is not None
+		}
+
+	progress_printer = None if args.quiet else ProgressPrinter()
+	# low memory mode doesn't keep contours around between glyphs
+	contour_cache = None if args.low_memory else ContourCache()
+	x_rayed_ufo = x_ray(ufo, palettes=args.palettes, colr_version=args.colr_version, static_location=static_location, contour_cache=contour_cache, low_memory=args.low_memory, memory_limit=args.memory_limit * 1024 * 1024, progress_callback=progress_printer)
+	if progress_printer is not None:
+		progress_printer.finish()
+		if contour_cache is not None:
+			stats = contour_cache.stats()
+			print(f"contour cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})", file=sys.stderr)
 	output_file_name = f"{ufo_path.stem}_x_rayed.ttf"
 	x_rayed_ufo.save(ufo_path.parent/output_file_name)
 
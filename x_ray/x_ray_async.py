@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from fontTools.ttLib import TTFont
+
+try:
+	from .x_ray import x_ray, check_static_location
+except ModuleNotFoundError:
+	from x_ray import x_ray, check_static_location
+
+
+_executor = None
+_manager = None
+_jobs = {}
+
+
+def get_executor(max_workers=None):
+	"""Process pool shared by all x_ray_async() calls, created on first use."""
+	global _executor, _manager
+	if _executor is None:
+		_executor = ProcessPoolExecutor(max_workers=max_workers)
+		_manager = multiprocessing.Manager()
+	return _executor
+
+
+def shutdown_executor():
+	"""Shut the process pool down, waiting for running builds.
+
+	This blocks, so don't call it from a running event loop, await
+	shutdown_executor_async() there instead.
+	"""
+	global _executor, _manager
+	if _executor is not None:
+		_executor.shutdown()
+		_manager.shutdown()
+		_executor = None
+		_manager = None
+
+
+def discard_executor(executor):
+	"""Forget a broken pool (e.g. after a worker was killed), the next call creates a new one."""
+	global _executor, _manager
+	if _executor is not executor:
+		return
+	manager = _manager
+	_executor = None
+	_manager = None
+	executor.shutdown(wait=False)
+	# joins the manager process, so keep it off the event loop
+	threading.Thread(target=manager.shutdown, daemon=True).start()
+
+
+async def shutdown_executor_async():
+	await asyncio.get_running_loop().run_in_executor(None, shutdown_executor)
+
+
+def build(font_data, kwargs, cancel_event):
+	"""Runs in a worker process, returns the compiled font as bytes."""
+	font = pickle.loads(font_data)
+	compiled = x_ray(font, cancel_event=cancel_event, **kwargs)
+	stream = BytesIO()
+	compiled.save(stream)
+	return stream.getvalue()
+
+
+class Job:
+	def __init__(self, key, font_data, kwargs):
+		self.key = key
+		self.waiters = 0
+		try:
+			self.submit(font_data, kwargs)
+		except BrokenProcessPool:
+			discard_executor(self.executor)
+			self.submit(font_data, kwargs)
+		self.future.add_done_callback(self.finished)
+
+	def submit(self, font_data, kwargs):
+		self.executor = get_executor()
+		self.cancel_event = _manager.Event()
+		loop = asyncio.get_running_loop()
+		self.future = loop.run_in_executor(self.executor, build, font_data, kwargs, self.cancel_event)
+
+	def finished(self, future):
+		self.forget()
+		if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+			discard_executor(self.executor)
+
+	def forget(self):
+		if _jobs.get(self.key) is self:
+			del _jobs[self.key]
+
+	def cancel(self):
+		# the worker notices the event between glyphs and stages
+		self.cancel_event.set()
+		self.future.cancel()
+		self.forget()
+
+
+def input_hash(font_data, kwargs):
+	digest = hashlib.sha256(font_data)
+	digest.update(repr(sorted(kwargs.items())).encode())
+	return digest.hexdigest()
+
+
+def prepare_input(font, kwargs):
+	"""Pickled font and the job key, computed off the event loop."""
+	font_data = pickle.dumps(font, protocol=pickle.HIGHEST_PROTOCOL)
+	return font_data, input_hash(font_data, kwargs)
+
+
+async def x_ray_async(font, **kwargs):
+	"""x_ray() in the shared process pool without blocking the event loop.
+
+	Concurrent calls for the same font and arguments share one build.
+	Cancelling the awaiting task aborts the build once no other caller is
+	waiting for it. kwargs are passed to x_ray() and must be picklable;
+	progress_callback, cancel_event and contour_cache are not supported. The font is
+	pickled in a thread, so don't modify it until the call returns. If a
+	worker dies, the builds it was running raise BrokenProcessPool and the
+	next call starts a new pool.
+	"""
+	for argument in ["progress_callback", "cancel_event", "contour_cache"]:
+		if argument in kwargs:
+			raise TypeError(f"x_ray_async() doesn't support {argument}")
+	if kwargs.get("static_location") is not None:
+		check_static_location(kwargs["static_location"])
+	get_executor()
+	font_data, key = await asyncio.get_running_loop().run_in_executor(None, prepare_input, font, kwargs)
+	job = _jobs.get(key)
+	if job is None:
+		job = _jobs[key] = Job(key, font_data, kwargs)
+
+	job.waiters += 1
+	try:
+		font_bytes = await asyncio.shield(job.future)
+	except asyncio.CancelledError:
+		job.waiters -= 1
+		if job.waiters == 0:
+			job.cancel()
+		raise
+	job.waiters -= 1
+	return TTFont(BytesIO(font_bytes))